@@ -33,6 +33,7 @@ from starlette.websockets import WebSocketState
 from dotenv import load_dotenv
 
 # Initialize our core components
+from src.graph.environments.browser import BrowserEnvironment
 from src.graph.environments.terminal import TerminalManager
 from src.utils.default_config_settings import default_config
 from src.lto.main import analyze_event_log, summarize_with_ai
@@ -93,6 +94,15 @@ app.middleware_stack = WorkflowSrvApp.middleware_stack
 # Initialize authentication
 setup_api_key_auth(app)
 
+
+async def shutdown_browser():
+    """Close the shared browser so Chromium doesn't outlive the server"""
+    await BrowserEnvironment().cleanup()
+
+
+# Registered after the router swap so the handler lands on the active router
+app.add_event_handler("shutdown", shutdown_browser)
+
 # Add CORS middleware after workflow server middleware
 app.add_middleware(
     CORSMiddleware,
@@ -17,6 +17,7 @@ import os
 import asyncio
 import logging
 from dataclasses import dataclass
+from typing import Optional, Tuple
 
 from browser_use.browser.browser import Browser
 from browser_use.browser.context import BrowserContext, BrowserContextConfig
@@ -47,6 +48,8 @@ class CustomBrowserContext(BrowserContext):
         self, browser: "Browser", config: BrowserContextConfig = BrowserContextConfig()
     ):
         super(CustomBrowserContext, self).__init__(browser=browser, config=config)
+        # Last rendered element tree, matched by identity
+        self._semantic_cache: Optional[Tuple[DOMElementNode, str]] = None
 
     @time_execution_sync(
         "--get_state"
@@ -65,6 +68,11 @@ class CustomBrowserContext(BrowserContext):
 
     async def get_semantic_elements_string(self, element_tree: DOMElementNode) -> str:
         """Convert the processed DOM content to semantic HTML string."""
+        # A reused state (e.g. the fallback in _update_state) keeps its tree object
+        cached = self._semantic_cache
+        if cached is not None and cached[0] is element_tree:
+            return cached[1]
+
         formatted_text = []
 
         def process_node(node: DOMBaseNode, depth: int) -> None:
@@ -84,7 +92,9 @@ class CustomBrowserContext(BrowserContext):
                     formatted_text.append(f"_[:]{node.text}")
 
         process_node(element_tree, 0)
-        return "\n".join(formatted_text)
+        result = "\n".join(formatted_text)
+        self._semantic_cache = (element_tree, result)
+        return result
 
     async def _update_state(
         self, use_vision: bool = False, focus_element: int = -1
@@ -13,11 +13,24 @@
 # limitations under the License.
 #
 # SPDX-License-Identifier: Apache-2.0
+import asyncio
 from typing import Dict, List, Literal, Optional, Union
 
 from langchain_core.messages import AIMessage, HumanMessage
 from pydantic import BaseModel, Field
 
+_STATUS_SYMBOL = {
+    "not_started": "[ ]",
+    "in_progress": "[→]",
+    "completed": "[✓]",
+    "blocked": "[!]",
+}
+_PLAN_HEADER_TEMPLATE = "The current plan: {title} (ID: {plan_id})\n"
+_PLAN_STATUS_TEMPLATE = (
+    "Status: {completed} completed, {in_progress} in progress, "
+    "{blocked} blocked, {not_started} not started\n\n"
+)
+
 
 def step_to_dict(step: "Step") -> Dict:
     """Convert a Step to a dictionary representation"""
@@ -60,18 +73,12 @@ class Plan(BaseModel):
 
 
 class PlanningEnvironment:
-    """Manages global planning state as a singleton"""
-
-    _instance = None
-    _plans: Dict[str, Plan]
-    _current_plan_id: Optional[str]
+    """Manages the planning state for a single thread"""
 
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(PlanningEnvironment, cls).__new__(cls)
-            cls._instance._plans = {}
-            cls._instance._current_plan_id = None
-        return cls._instance
+    def __init__(self):
+        self._plans: Dict[str, Plan] = {}
+        self._current_plan_id: Optional[str] = None
+        self._lock = asyncio.Lock()
 
     def get_plan(self, plan_id: Optional[str] = None) -> Optional[Plan]:
         """Get plan by ID or current active plan"""
@@ -85,13 +92,19 @@ class PlanningEnvironment:
             raise ValueError(f"No plan found with ID: {plan_id}")
         self._current_plan_id = plan_id
 
-    def create_plan(self, plan: Plan) -> None:
+    async def create_plan(self, plan: Plan) -> None:
         """Create new plan"""
-        self._plans[plan.plan_id] = plan
-        self._current_plan_id = plan.plan_id
+        async with self._lock:
+            self._plans[plan.plan_id] = plan
+            self._current_plan_id = plan.plan_id
 
-    def update_plan(self, plan_id: str, updates: Dict) -> None:
+    async def update_plan(self, plan_id: str, updates: Dict) -> None:
         """Update existing plan"""
+        async with self._lock:
+            self._update_plan(plan_id, updates)
+
+    def _update_plan(self, plan_id: str, updates: Dict) -> None:
+        """Apply updates to an existing plan; caller must hold the lock"""
         if plan_id not in self._plans:
             raise ValueError(f"No plan found with ID: {plan_id}")
         plan = self._plans[plan_id]
@@ -100,39 +113,69 @@ class PlanningEnvironment:
         if "step_index" in updates and "step_status" in updates:
             index_path = updates.pop("step_index")
             new_status = updates.pop("step_status")
-
-            # Handle both single index and nested index paths
-            indices = index_path if isinstance(index_path, list) else [index_path]
-
-            current_step = None
-            current_steps = plan.steps
-
-            # Navigate to the correct step
-            for idx in indices[:-1]:
-                if 0 <= idx < len(current_steps):
-                    current_step = current_steps[idx]
-                    current_steps = current_step.substeps
-                else:
-                    raise ValueError(f"Invalid step index: {idx}")
-
-            # Update the final step's status
-            final_idx = indices[-1]
-            if 0 <= final_idx < len(current_steps):
-                current_steps[final_idx].status = new_status
-            else:
-                raise ValueError(f"Invalid step index: {final_idx}")
+            self._find_step(plan, index_path).status = new_status
+
+        # Reasserting the same steps is common; keep the existing Step objects
+        # for the unchanged prefix instead of swapping in fresh copies
+        if "steps" in updates:
+            new_steps = updates.pop("steps")
+            old_steps = plan.steps
+            common = 0
+            limit = min(len(new_steps), len(old_steps))
+            while common < limit and new_steps[common] == old_steps[common]:
+                common += 1
+            if common < len(new_steps) or common < len(old_steps):
+                plan.steps = old_steps[:common] + new_steps[common:]
 
         # Apply any other updates to the plan
         for key, value in updates.items():
             setattr(plan, key, value)
 
-    def delete_plan(self, plan_id: str) -> None:
+    async def mark_steps(self, plan_id: str, step_updates: List[Dict]) -> None:
+        """Apply a batch of step status/notes updates in a single pass.
+
+        Every index is resolved before anything is written, so an invalid
+        index leaves the plan untouched.
+        """
+        async with self._lock:
+            if plan_id not in self._plans:
+                raise ValueError(f"No plan found with ID: {plan_id}")
+            plan = self._plans[plan_id]
+
+            resolved = [
+                (self._find_step(plan, update["index"]), update)
+                for update in step_updates
+            ]
+            # Only write fields that actually change
+            for step, update in resolved:
+                if step.status != update["status"]:
+                    step.status = update["status"]
+                if "notes" in update and step.notes != update["notes"]:
+                    step.notes = update["notes"]
+
+    def _find_step(self, plan: Plan, index_path: Union[int, List[int]]) -> Step:
+        """Navigate to a step by its (possibly nested) index path"""
+        # Handle both single index and nested index paths
+        indices = index_path if isinstance(index_path, list) else [index_path]
+
+        current_steps = plan.steps
+        for depth, idx in enumerate(indices):
+            if not 0 <= idx < len(current_steps):
+                raise ValueError(f"Invalid step index: {idx}")
+            if depth == len(indices) - 1:
+                return current_steps[idx]
+            current_steps = current_steps[idx].substeps
+
+        raise ValueError("Step index path is empty")
+
+    async def delete_plan(self, plan_id: str) -> None:
         """Delete a plan"""
-        if plan_id not in self._plans:
-            raise ValueError(f"No plan found with ID: {plan_id}")
-        del self._plans[plan_id]
-        if self._current_plan_id == plan_id:
-            self._current_plan_id = None
+        async with self._lock:
+            if plan_id not in self._plans:
+                raise ValueError(f"No plan found with ID: {plan_id}")
+            del self._plans[plan_id]
+            if self._current_plan_id == plan_id:
+                self._current_plan_id = None
 
     def list_plans(self) -> Dict[str, Plan]:
         """List all plans"""
@@ -162,53 +205,61 @@ class PlanningEnvironment:
 
         return stats
 
-    def _format_steps(self, steps: List[Step], level: int = 0) -> str:
-        """Format steps recursively with proper indentation"""
-        output = ""
+    def _append_steps(self, steps: List[Step], level: int, parts: List[str]) -> None:
+        """Append formatted steps recursively with proper indentation"""
         indent = "    " * level
 
         for i, step in enumerate(steps):
-            status_symbol = {
-                "not_started": "[ ]",
-                "in_progress": "[→]",
-                "completed": "[✓]",
-                "blocked": "[!]",
-            }.get(step.status, "[ ]")
-
-            output += f"{indent}{i}. {status_symbol} {step.content}\n"
+            status_symbol = _STATUS_SYMBOL.get(step.status, "[ ]")
+
+            parts.append(f"{indent}{i}. {status_symbol} {step.content}\n")
             if step.notes:
-                output += f"{indent}   Notes: {step.notes}\n"
+                parts.append(f"{indent}   Notes: {step.notes}\n")
 
             if step.substeps:
-                output += self._format_steps(step.substeps, level + 1)
+                self._append_steps(step.substeps, level + 1, parts)
+
+    def _format_steps(self, steps: List[Step], level: int = 0) -> str:
+        """Format steps recursively with proper indentation"""
+        parts: List[str] = []
+        self._append_steps(steps, level, parts)
+        return "".join(parts)
 
-        return output
+    def format_plan_dict(self, plan: Plan) -> Dict:
+        """Structured counterpart of format_plan for non-LLM consumers"""
+        stats = self._calculate_step_stats(plan.steps)
+        total = stats["total"]
+        plan_dict = plan.to_dict()
+        plan_dict["progress"] = {
+            **stats,
+            "percentage": (stats["completed"] / total) * 100 if total else 0.0,
+        }
+        return plan_dict
 
     def format_plan(self, plan: Plan) -> str:
         """Format plan for display with nested steps"""
-        output = f"The current plan: {plan.title} (ID: {plan.plan_id})\n"
-        output += "=" * len(output) + "\n\n"
+        header = _PLAN_HEADER_TEMPLATE.format_map(
+            {"title": plan.title, "plan_id": plan.plan_id}
+        )
+        parts = [header, "=" * len(header), "\n\n"]
 
         # Calculate progress statistics recursively
         stats = self._calculate_step_stats(plan.steps)
         total = stats["total"]
         completed = stats["completed"]
 
-        output += f"Progress: {completed}/{total} steps completed "
+        parts.append(f"Progress: {completed}/{total} steps completed ")
         if total > 0:
             percentage = (completed / total) * 100
-            output += f"({percentage:.1f}%)\n"
+            parts.append(f"({percentage:.1f}%)\n")
         else:
-            output += "(0%)\n"
+            parts.append("(0%)\n")
 
-        output += (
-            f"Status: {completed} completed, {stats['in_progress']} in progress, "
-            f"{stats['blocked']} blocked, {stats['not_started']} not started\n\n"
-        )
-        output += "Steps:\n"
-        output += self._format_steps(plan.steps)
+        parts.append(_PLAN_STATUS_TEMPLATE.format_map(stats))
+        parts.append("Steps:\n")
+        self._append_steps(plan.steps, 0, parts)
 
-        return output
+        return "".join(parts)
 
     def get_message_for_current_plan(self) -> HumanMessage:
         plan = self.get_plan()
@@ -108,7 +108,7 @@ class PlanningNode(BaseNode):
         # Update plan in state if available
         plan = planning_env.get_plan()
         if plan:
-            state["plan"] = plan.to_dict()
+            state["plan"] = planning_env.format_plan_dict(plan)
         else:
             state["plan"] = None
 
@@ -30,6 +30,10 @@ logger = logging.getLogger(__name__)
 
 MAX_LENGTH = 2000
 
+_SCROLL_JS = "window.scrollBy(0, {});".format
+# Truncate in the page so only MAX_LENGTH + 1 chars cross the CDP boundary
+_HTML_PREFIX_JS = f"document.documentElement.outerHTML.slice(0, {MAX_LENGTH + 1})"
+
 
 class BrowserAction(str, Enum):
     """Supported browser actions"""
@@ -306,7 +310,7 @@ async def browser_use_tool(
             return ToolResult(output=screenshot, system=screenshot)
 
         elif params.action == BrowserAction.GET_HTML:
-            html = await browser_context.get_page_html()
+            html = await browser_context.execute_javascript(_HTML_PREFIX_JS)
             truncated = html[:MAX_LENGTH] + "..." if len(html) > MAX_LENGTH else html
             return ToolResult(output=truncated)
 
@@ -323,12 +327,10 @@ async def browser_use_tool(
             return ToolResult(output=result)
 
         elif params.action == BrowserAction.SCROLL:
-            if not params.scroll_amount:
+            if scroll_amount is None:
                 return ToolResult(error="Scroll amount is required for 'scroll' action")
-            await browser_context.execute_javascript(
-                f"window.scrollBy(0, {scroll_amount});"
-            )
-            direction = "down" if scroll_amount > 0 else "up"
+            await browser_context.execute_javascript(_SCROLL_JS(scroll_amount))
+            direction = "down" if scroll_amount >= 0 else "up"
             return ToolResult(
                 output=f"Scrolled {direction} by {abs(scroll_amount)} pixels"
             )
@@ -345,11 +347,11 @@ async def browser_use_tool(
             await browser_context.create_new_tab(url)
             return ToolResult(output=f"Opened new tab with URL {url}")
 
-        elif action == "close_tab":
+        elif params.action == BrowserAction.CLOSE_TAB:
             await browser_context.close_current_tab()
             return ToolResult(output="Closed current tab")
 
-        elif action == "refresh":
+        elif params.action == BrowserAction.REFRESH:
             await browser_context.refresh_page()
             return ToolResult(output="Refreshed current page")
 
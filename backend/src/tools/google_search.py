@@ -14,7 +14,13 @@
 #
 # SPDX-License-Identifier: Apache-2.0
 import asyncio
+import atexit
 import logging
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 
 from googlesearch import search
 from langchain_core.tools import tool
@@ -24,6 +30,90 @@ from .base import ToolResult
 
 logger = logging.getLogger(__name__)
 
+# Dedicated pool so slow Google responses don't starve the loop's default executor
+_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.getenv("GSEARCH_WORKERS", "8")),
+    thread_name_prefix="gsearch",
+)
+atexit.register(_EXECUTOR.shutdown, wait=False)
+
+SearchKey = Tuple[str, int, str, bool]
+
+# TTL-bounded LRU of completed searches, plus in-flight searches so concurrent
+# identical queries share a single request
+_CACHE_MAXSIZE = 512
+_CACHE_TTL = float(os.getenv("GSEARCH_CACHE_TTL", "300"))
+_search_cache: "OrderedDict[SearchKey, Tuple[float, List[str]]]" = OrderedDict()
+_inflight: Dict[SearchKey, "asyncio.Future[List[str]]"] = {}
+# Bumped on clear so searches started before a clear don't repopulate the cache
+_cache_generation = 0
+
+
+def clear_search_cache() -> None:
+    """Drop all cached search results"""
+    global _cache_generation
+    _search_cache.clear()
+    _inflight.clear()
+    _cache_generation += 1
+
+
+def _get_cached(key: SearchKey) -> Optional[List[str]]:
+    entry = _search_cache.get(key)
+    if entry is None:
+        return None
+    expires_at, links = entry
+    if expires_at < time.monotonic():
+        del _search_cache[key]
+        return None
+    _search_cache.move_to_end(key)
+    return links
+
+
+def _set_cached(key: SearchKey, links: List[str]) -> None:
+    _search_cache[key] = (time.monotonic() + _CACHE_TTL, links)
+    _search_cache.move_to_end(key)
+    while len(_search_cache) > _CACHE_MAXSIZE:
+        _search_cache.popitem(last=False)
+
+
+def _start_search(key: SearchKey) -> "asyncio.Future[List[str]]":
+    """Start a search in the thread pool, owned by no caller, and track it"""
+    query, num_results, lang, safe = key
+    generation = _cache_generation
+    # Run search in the dedicated thread pool to prevent blocking
+    future = asyncio.get_running_loop().run_in_executor(
+        _EXECUTOR,
+        lambda: list(search(query, num_results=num_results, lang=lang, safe=safe)),
+    )
+
+    def _on_done(fut: "asyncio.Future[List[str]]") -> None:
+        if _inflight.get(key) is fut:
+            del _inflight[key]
+        # exception() also marks failures retrieved when nobody awaits them
+        if fut.cancelled() or fut.exception() is not None:
+            return
+        if generation == _cache_generation:
+            _set_cached(key, fut.result())
+
+    future.add_done_callback(_on_done)
+    _inflight[key] = future
+    return future
+
+
+async def _cached_search(
+    query: str, num_results: int, lang: str, safe: bool
+) -> List[str]:
+    """Run a search, reusing recent results and in-flight requests for the same key"""
+    key = (query, num_results, lang, safe)
+
+    links = _get_cached(key)
+    if links is not None:
+        return list(links)
+
+    future = _inflight.get(key) or _start_search(key)
+    # Shielded, so a cancelled caller never cancels the search others share
+    return list(await asyncio.shield(future))
+
 
 class GoogleSearchInput(BaseModel):
     """Input parameters for Google search"""
@@ -60,12 +150,7 @@ async def google_search_tool(
     logger.info(f"Google search tool invoked with query: {query}")
 
     try:
-        # Run search in thread pool to prevent blocking
-        loop = asyncio.get_event_loop()
-        links = await loop.run_in_executor(
-            None,
-            lambda: list(search(query, num_results=num_results, lang=lang, safe=safe)),
-        )
+        links = await _cached_search(query, num_results, lang, safe)
 
         if not links:
             return ToolResult(output=[], system="No results found for query")
@@ -45,6 +45,9 @@ class StepStatus(str, Enum):
     BLOCKED = "blocked"
 
 
+_VALID_STATUSES = frozenset(s.value for s in StepStatus)
+
+
 def create_step_hierarchy(steps_data: List[Dict]) -> List[Step]:
     """Convert a list of step dictionaries into Step objects with proper nesting"""
     result = []
@@ -115,12 +118,14 @@ async def planning_tool(
 
     - MARK_STEPS: Update steps' statuses. Requires 'plan_id' and 'step_updates' array.
       For nested steps, use an array of indices to specify the path.
+      Each update may also carry optional 'notes' for the step.
+      Send all related updates in one call; they are applied together.
       Example: {
           "command": "mark_steps",
           "plan_id": "plan_0",
           "step_updates": [
               { "index": 0, "status": "completed" },              // Update main step
-              { "index": [1, 0], "status": "in_progress" }       // Update first substep of second main step
+              { "index": [1, 0], "status": "in_progress", "notes": "Started" }  // Update first substep of second main step
           ]
       }
 
@@ -157,7 +162,7 @@ async def planning_tool(
                 return ToolResult(error=f"Invalid steps format: {str(e)}")
 
             plan = Plan(plan_id=plan_id, title=title or task, steps=step_objects)
-            planning_env.create_plan(plan)
+            await planning_env.create_plan(plan)
 
         elif command == PlanCommand.UPDATE_PLAN:
             if not plan_id:
@@ -176,7 +181,7 @@ async def planning_tool(
             if title:
                 updates["title"] = title
 
-            planning_env.update_plan(plan_id, updates)
+            await planning_env.update_plan(plan_id, updates)
 
         elif command == PlanCommand.MARK_STEPS:
             if not plan_id:
@@ -190,6 +195,7 @@ async def planning_tool(
             if not plan:
                 return ToolResult(error=f"No plan found with ID: {plan_id}")
 
+            pending_updates = []
             for update in step_updates:
                 if not isinstance(update, dict):
                     return ToolResult(error="Each step update must be a dictionary")
@@ -201,18 +207,23 @@ async def planning_tool(
                     return ToolResult(error="Each step update requires an 'index'")
                 if not status:
                     return ToolResult(error="Each step update requires a 'status'")
-                if status not in [s.value for s in StepStatus]:
+                if status not in _VALID_STATUSES:
                     return ToolResult(error=f"Invalid status: {status}")
 
                 # Convert single index to list format for consistency
-                index_path = index if isinstance(index, list) else [index]
-
-                try:
-                    planning_env.update_plan(
-                        plan_id, {"step_index": index_path, "step_status": status}
-                    )
-                except ValueError as e:
-                    return ToolResult(error=str(e))
+                pending = {
+                    "index": index if isinstance(index, list) else [index],
+                    "status": status,
+                }
+                if "notes" in update:
+                    pending["notes"] = update["notes"]
+                pending_updates.append(pending)
+
+            # Apply the whole batch at once rather than one update per call
+            try:
+                await planning_env.mark_steps(plan_id, pending_updates)
+            except ValueError as e:
+                return ToolResult(error=str(e))
 
         plan = planning_env.get_plan(plan_id)
         return ToolResult(
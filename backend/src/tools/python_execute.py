@@ -13,11 +13,11 @@
 # limitations under the License.
 #
 # SPDX-License-Identifier: Apache-2.0
+import asyncio
 import logging
+import os
+import signal
 import sys
-import threading
-from io import StringIO
-from typing import Dict
 
 from langchain_core.tools import tool
 from pydantic import BaseModel, Field
@@ -27,38 +27,12 @@ from .base import ToolResult
 logger = logging.getLogger(__name__)
 
 
-class CodeExecutor:
-    """Manages safe Python code execution in a separate thread"""
-
-    def __init__(self):
-        self.output_buffer = StringIO()
-        self.result = {"output": "", "error": None}
-
-    def execute(self, code: str) -> Dict:
-        """Execute code in a controlled environment"""
-        # Save original stdout
-        original_stdout = sys.stdout
-        sys.stdout = self.output_buffer
-
-        try:
-            # Create restricted globals with direct access to builtins
-            safe_globals = {
-                "__builtins__": __builtins__,  # Use full builtins instead of restricted dict
-            }
-
-            # Execute code with restricted globals
-            exec(code, safe_globals, {})
-            self.result["output"] = self.output_buffer.getvalue()
-
-        except Exception as e:
-            self.result["error"] = str(e)
-
-        finally:
-            # Restore original stdout
-            sys.stdout = original_stdout
-            self.output_buffer.close()
-
-        return self.result
+def _kill_process_group(proc: asyncio.subprocess.Process) -> None:
+    """Kill the child and anything it spawned"""
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
 
 
 class PythonExecuteInput(BaseModel):
@@ -87,29 +61,48 @@ async def python_execute_tool(code: str, timeout: int = 5) -> ToolResult:
     if not code:
         return ToolResult(error="Code is required")
 
-    executor = CodeExecutor()
-    result = {"output": "", "error": None}
-
-    def run_code():
-        nonlocal result
-        result = executor.execute(code)
-
-    # Run code in separate thread with timeout
-    thread = threading.Thread(target=run_code)
-    thread.start()
-    thread.join(timeout)
+    # Run code in an isolated child process so a timeout actually reclaims it.
+    # The code is fed on stdin rather than argv, so any size or content reaches
+    # the interpreter, and input() gets EOF instead of the server's terminal.
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            sys.executable,
+            "-I",
+            "-",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            start_new_session=True,
+        )
+    except OSError as e:
+        logger.error(f"Failed to start Python process: {e}")
+        return ToolResult(
+            error=f"Failed to start Python process: {e}",
+            system="Code execution failed",
+        )
 
-    # Handle timeout
-    if thread.is_alive():
+    try:
+        stdout, stderr = await asyncio.wait_for(
+            proc.communicate(code.encode(errors="replace")), timeout
+        )
+    except asyncio.TimeoutError:
         return ToolResult(
             error=f"Execution timeout after {timeout} seconds",
             system="Code execution terminated due to timeout",
         )
+    finally:
+        # Reap the child on timeout or cancellation
+        if proc.returncode is None:
+            _kill_process_group(proc)
+            await proc.wait()
 
     # Return results
-    if result["error"]:
-        return ToolResult(error=result["error"], system="Code execution failed")
+    if proc.returncode != 0:
+        error_lines = stderr.decode(errors="replace").strip().splitlines()
+        error = error_lines[-1] if error_lines else f"Exit code {proc.returncode}"
+        return ToolResult(error=error, system="Code execution failed")
 
     return ToolResult(
-        output=result["output"].strip(), system="Code executed successfully"
+        output=stdout.decode(errors="replace").strip(),
+        system="Code executed successfully",
     )
@@ -14,9 +14,15 @@
 #
 # SPDX-License-Identifier: Apache-2.0
 import asyncio
+import io
 import logging
-from collections import defaultdict
+import os
+import stat
+import time
+import zlib
+from collections import OrderedDict, deque
 from enum import Enum
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Optional
 
@@ -28,44 +34,117 @@ from .base import ToolResult
 # Constants
 SNIPPET_LINES: int = 4
 MAX_RESPONSE_LEN: int = 16000
+MAX_HISTORY_BYTES: int = 64 * 1024 * 1024
+OFFLOAD_BYTES: int = 256 * 1024  # Compress larger snapshots off the event loop
 TRUNCATED_MESSAGE: str = (
     "<response clipped><NOTE>To save on context only part of this file has been shown."
     "You should retry this tool after you have searched inside the file with `grep -n` "
     "in order to find the line numbers of what you are looking for.</NOTE>"
 )
 
+# Same layout as f"{n:6}\t{line}"
+_CAT_LINE_FMT = "%6d\t%s\n"
+
 logger = logging.getLogger(__name__)
 
 
 class FileHistoryManager:
     """Manages file history with proper locking and cleanup"""
 
-    def __init__(self):
-        self._history: Dict[Path, List[str]] = defaultdict(list)
+    def __init__(
+        self,
+        coalesce_window: float = 0.5,
+        max_total_bytes: int = MAX_HISTORY_BYTES,
+    ):
+        # Snapshots are stored zlib-compressed; paths are kept in LRU order
+        self._history: "OrderedDict[Path, deque[bytes]]" = OrderedDict()
         self._lock = asyncio.Lock()
+        self._path_locks: Dict[Path, asyncio.Lock] = {}
+        self._last_ts: Dict[Path, float] = {}
+        self._coalesce_window = coalesce_window
         self._max_history_per_file = 100  # Prevent unbounded growth
+        self._max_total_bytes = max_total_bytes
+        self._total_bytes = 0
+
+    def lock_for(self, path: Path) -> asyncio.Lock:
+        """Get the lock serializing edits to a single file"""
+        return self._path_locks.setdefault(path, asyncio.Lock())
 
     async def add_history(self, path: Path, content: str) -> None:
-        """Add file content to history with bounds checking"""
+        """Add file content to history with bounds checking.
+
+        Snapshots taken within coalesce_window of the previous edit are
+        dropped, and the window restarts with every edit, so a burst of edits
+        is undone in a single step back to the content from before the burst.
+        """
+        now = time.monotonic()
+        if (
+            self._history.get(path)
+            and now - self._last_ts.get(path, 0) < self._coalesce_window
+        ):
+            # Slide the window so the burst stays one checkpoint
+            self._last_ts[path] = now
+            return
+
+        data = content.encode("utf-8")
+        if len(data) > OFFLOAD_BYTES:
+            blob = await asyncio.to_thread(zlib.compress, data, 1)
+        else:
+            blob = zlib.compress(data, 1)
+
         async with self._lock:
-            history = self._history[path]
-            history.append(content)
-            # Maintain bounded history
-            if len(history) > self._max_history_per_file:
-                history.pop(0)
+            self._last_ts[path] = now
+            history = self._history.get(path)
+            if history is None:
+                history = deque(maxlen=self._max_history_per_file)
+                self._history[path] = history
+            else:
+                self._history.move_to_end(path)
+            # Maintain bounded history; the full deque drops its oldest entry
+            if len(history) == history.maxlen:
+                self._total_bytes -= len(history[0])
+            history.append(blob)
+            self._total_bytes += len(blob)
+            self._evict()
+
+    def _evict(self) -> None:
+        """Drop snapshots of the least recently used paths until within budget"""
+        while self._total_bytes > self._max_total_bytes and self._history:
+            path, history = next(iter(self._history.items()))
+            if history:
+                self._total_bytes -= len(history.popleft())
+            if not history:
+                del self._history[path]
 
     async def get_last_version(self, path: Path) -> Optional[str]:
         """Get last version of file content"""
         async with self._lock:
-            history = self._history[path]
-            return history.pop() if history else None
+            history = self._history.get(path)
+            # The next edit after an undo starts a fresh checkpoint
+            self._last_ts.pop(path, None)
+            if not history:
+                return None
+            self._history.move_to_end(path)
+            blob = history.pop()
+            self._total_bytes -= len(blob)
+
+        if len(blob) > OFFLOAD_BYTES:
+            data = await asyncio.to_thread(zlib.decompress, blob)
+        else:
+            data = zlib.decompress(blob)
+        return data.decode("utf-8")
 
     def cleanup(self, path: Optional[Path] = None) -> None:
         """Clean up history for a path or all paths"""
         if path:
-            self._history.pop(path, None)
+            self._total_bytes -= sum(map(len, self._history.pop(path, ())))
+            self._path_locks.pop(path, None)
+            self._last_ts.pop(path, None)
         else:
             self._history.clear()
+            self._path_locks.clear()
+            self._last_ts.clear()
+            self._total_bytes = 0
 
 
 # Create singleton instance
@@ -83,6 +162,64 @@ def maybe_truncate(
     )
 
 
+def _nth_newline_offset(content: str, n: int) -> int:
+    """Offset of the nth (1-based) newline in content, or -1 if there are fewer"""
+    offset = -1
+    for _ in range(n):
+        offset = content.find("\n", offset + 1)
+        if offset == -1:
+            break
+    return offset
+
+
+def _line_start(content: str, pos: int, lines_back: int = 0) -> int:
+    """Offset of the start of the line `lines_back` lines above the one at pos"""
+    start = content.rfind("\n", 0, pos) + 1
+    for _ in range(lines_back):
+        if start == 0:
+            break
+        start = content.rfind("\n", 0, start - 1) + 1
+    return start
+
+
+def _line_end(content: str, pos: int, lines_forward: int = 0) -> int:
+    """Offset of the end of the line `lines_forward` lines below the one at pos"""
+    end = content.find("\n", pos)
+    for _ in range(lines_forward):
+        if end == -1:
+            break
+        end = content.find("\n", end + 1)
+    return len(content) if end == -1 else end
+
+
+def _list_dir(path: Path, limit: int = MAX_RESPONSE_LEN) -> str:
+    """List a directory tree, skipping hidden entries and stopping past limit"""
+    entries: List[str] = []
+    size = 0
+    for root, dirnames, filenames in os.walk(path):
+        # Prune hidden directories in place so os.walk never descends into them
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+        files = sorted(f for f in filenames if not f.startswith("."))
+        for name in dirnames + files:
+            entry = os.path.join(root, name)
+            entries.append(entry)
+            size += len(entry) + 1
+            if size > limit:
+                return maybe_truncate("\n".join(entries), limit)
+    return "\n".join(entries)
+
+
+def _expand_if_needed(s: str) -> str:
+    """Expand tabs, returning s itself when it has none"""
+    return s.expandtabs() if "\t" in s else s
+
+
+@lru_cache(maxsize=1024)
+def _resolve(cwd: str, path: str) -> Path:
+    """Resolve a relative path against cwd, memoized per (cwd, path)"""
+    return (Path(cwd) / path).resolve()
+
+
 def _make_output(
     file_content: str,
     file_descriptor: str,
@@ -92,18 +229,13 @@ def _make_output(
     """Format file content for display"""
     file_content = maybe_truncate(file_content)
     if expand_tabs:
-        file_content = file_content.expandtabs()
-    file_content = "\n".join(
-        [
-            f"{i + init_line:6}\t{line}"
-            for i, line in enumerate(file_content.split("\n"))
-        ]
-    )
-    return (
-        f"Here's the result of running `cat -n` on {file_descriptor}:\n"
-        + file_content
-        + "\n"
-    )
+        file_content = _expand_if_needed(file_content)
+    buf = io.StringIO()
+    buf.write(f"Here's the result of running `cat -n` on {file_descriptor}:\n")
+    write = buf.write
+    for i, line in enumerate(file_content.split("\n"), init_line):
+        write(_CAT_LINE_FMT % (i, line))
+    return buf.getvalue()
 
 
 class EditorCommand(str, Enum):
@@ -148,7 +280,7 @@ async def str_replace_editor_tool(
       - create: adds new files (won't overwrite)
       - str_replace: updates content with exact match
       - insert: adds new content at specified line
-      - undo_edit: reverts last change
+      - undo_edit: reverts the last change (edits made within 0.5s are undone together)
 
     Args:
         command: The editor command to execute
@@ -166,32 +298,36 @@ async def str_replace_editor_tool(
         path_obj = Path(path)
         if not path_obj.is_absolute():
             # Convert relative path to absolute using current working directory
-            path_obj = Path.cwd() / path_obj
-            path_obj = path_obj.resolve()  # Resolve any .. or . in path
+            path_obj = _resolve(os.getcwd(), path)
 
-        # Validate path
-        if path_obj.exists() and command == EditorCommand.CREATE:
+        # Validate path from a single stat call
+        try:
+            st = await asyncio.to_thread(os.stat, path_obj)
+        except OSError:
+            st = None
+        exists = st is not None
+        is_dir = exists and stat.S_ISDIR(st.st_mode)
+
+        if exists and command == EditorCommand.CREATE:
             return ToolResult(error=f"Cannot create: {path_obj} already exists")
 
-        if not path_obj.exists() and command != EditorCommand.CREATE:
+        if not exists and command != EditorCommand.CREATE:
             return ToolResult(error=f"Path does not exist: {path_obj}")
 
-        if path_obj.is_dir() and command != EditorCommand.VIEW:
+        if is_dir and command != EditorCommand.VIEW:
             return ToolResult(
                 error=f"Path {path_obj} is a directory, only view command allowed"
             )
 
         # Execute commands
         if command == EditorCommand.VIEW:
-            if path_obj.is_dir():
+            if is_dir:
                 # List directory contents
-                content = "\n".join(
-                    str(p) for p in path_obj.glob("**/*") if not str(p).startswith(".")
-                )
+                content = await asyncio.to_thread(_list_dir, path_obj)
                 return ToolResult(output=f"Contents of {path_obj}:\n{content}")
 
             # Read file with optional range
-            content = path_obj.read_text()
+            content = await asyncio.to_thread(path_obj.read_text)
             if view_range:
                 start, end = view_range
                 lines = content.split("\n")
@@ -207,8 +343,9 @@ async def str_replace_editor_tool(
             if not file_text:
                 return ToolResult(error="file_text required for create command")
 
-            path_obj.write_text(file_text)
-            await _file_manager.add_history(path_obj, file_text)
+            async with _file_manager.lock_for(path_obj):
+                await asyncio.to_thread(path_obj.write_text, file_text)
+                await _file_manager.add_history(path_obj, file_text)
 
             return ToolResult(
                 output=f"Created file: {path_obj}\n"
@@ -219,29 +356,42 @@ async def str_replace_editor_tool(
             if not old_str:
                 return ToolResult(error="old_str required for str_replace command")
 
-            content = path_obj.read_text().expandtabs()
-            old_str_expanded = old_str.expandtabs()
-            new_str_expanded = new_str.expandtabs() if new_str else ""
+            old_str_expanded = _expand_if_needed(old_str)
+            new_str_expanded = _expand_if_needed(new_str) if new_str else ""
+
+            # Hold the file's lock across read-modify-write so concurrent edits
+            # to the same file serialize while other files proceed
+            async with _file_manager.lock_for(path_obj):
+                content = _expand_if_needed(await asyncio.to_thread(path_obj.read_text))
+
+                # Verify unique match; only count on the error path
+                idx = content.find(old_str_expanded)
+                if idx == -1:
+                    return ToolResult(error=f"String not found: {old_str_expanded}")
+                # Resume past the match, matching count()'s non-overlapping scan
+                if content.find(old_str_expanded, idx + len(old_str_expanded)) != -1:
+                    count = content.count(old_str_expanded)
+                    return ToolResult(
+                        error=f"Multiple matches ({count}) for: {old_str_expanded}"
+                    )
 
-            # Verify unique match
-            count = content.count(old_str_expanded)
-            if count == 0:
-                return ToolResult(error=f"String not found: {old_str_expanded}")
-            if count > 1:
-                return ToolResult(
-                    error=f"Multiple matches ({count}) for: {old_str_expanded}"
+                # Make replacement at the single match
+                new_content = (
+                    content[:idx]
+                    + new_str_expanded
+                    + content[idx + len(old_str_expanded) :]
                 )
+                await asyncio.to_thread(path_obj.write_text, new_content)
+                await _file_manager.add_history(path_obj, content)
 
-            # Make replacement
-            new_content = content.replace(old_str_expanded, new_str_expanded)
-            path_obj.write_text(new_content)
-            await _file_manager.add_history(path_obj, content)
-
-            # Show snippet around change
-            line_num = content.split(old_str_expanded)[0].count("\n")
+            # Show snippet around change, located from the match offset
+            line_num = content.count("\n", 0, idx)
             start = max(0, line_num - SNIPPET_LINES)
-            end = line_num + SNIPPET_LINES + new_str_expanded.count("\n")
-            snippet = "\n".join(new_content.split("\n")[start : end + 1])
+            snippet = new_content[
+                _line_start(new_content, idx, SNIPPET_LINES) : _line_end(
+                    new_content, idx + len(new_str_expanded), SNIPPET_LINES
+                )
+            ]
 
             return ToolResult(
                 output=f"Updated file: {path_obj}\n"
@@ -254,23 +404,38 @@ async def str_replace_editor_tool(
                     error="insert_line and new_str required for insert command"
                 )
 
-            content = path_obj.read_text()
-            lines = content.split("\n")
-            line_num = insert_line
-
-            if not (0 <= line_num <= len(lines)):
-                return ToolResult(error=f"Invalid line number: {line_num}")
-
-            # Insert content
-            new_lines = lines[:line_num] + new_str.split("\n") + lines[line_num:]
-            new_content = "\n".join(new_lines)
-            path_obj.write_text(new_content)
-            await _file_manager.add_history(path_obj, content)
+            async with _file_manager.lock_for(path_obj):
+                content = await asyncio.to_thread(path_obj.read_text)
+                line_num = insert_line
+
+                if not (0 <= line_num <= content.count("\n") + 1):
+                    return ToolResult(error=f"Invalid line number: {line_num}")
+
+                # Insert content at the offset of the target line
+                if line_num == 0:
+                    new_content = new_str + "\n" + content
+                else:
+                    offset = _nth_newline_offset(content, line_num)
+                    if offset == -1:
+                        new_content = content + "\n" + new_str
+                    else:
+                        new_content = (
+                            content[: offset + 1]
+                            + new_str
+                            + "\n"
+                            + content[offset + 1 :]
+                        )
+                await asyncio.to_thread(path_obj.write_text, new_content)
+                await _file_manager.add_history(path_obj, content)
 
             # Show snippet
             start = max(0, line_num - SNIPPET_LINES)
             end = line_num + SNIPPET_LINES
-            snippet = "\n".join(new_lines[start:end])
+            snippet_start = _nth_newline_offset(new_content, start) + 1 if start else 0
+            snippet_end = _nth_newline_offset(new_content, end)
+            snippet = new_content[
+                snippet_start : len(new_content) if snippet_end == -1 else snippet_end
+            ]
 
             return ToolResult(
                 output=f"Updated file: {path_obj}\n"
@@ -278,11 +443,12 @@ async def str_replace_editor_tool(
             )
 
         elif command == EditorCommand.UNDO_EDIT:
-            content = await _file_manager.get_last_version(path_obj)
-            if not content:
-                return ToolResult(error=f"No history for {path_obj}")
+            async with _file_manager.lock_for(path_obj):
+                content = await _file_manager.get_last_version(path_obj)
+                if not content:
+                    return ToolResult(error=f"No history for {path_obj}")
 
-            path_obj.write_text(content)
+                await asyncio.to_thread(path_obj.write_text, content)
             return ToolResult(
                 output=f"Reverted last change to {path_obj}\n"
                 + _make_output(content, str(path_obj))
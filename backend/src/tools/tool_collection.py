@@ -13,10 +13,13 @@
 # limitations under the License.
 #
 # SPDX-License-Identifier: Apache-2.0
+import asyncio
+import json
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
 from langchain.tools import BaseTool
+from langchain_core.utils.function_calling import convert_to_openai_tool
 
 from src.graph.types import WorkableToolCall
 
@@ -29,8 +32,14 @@ class ActionEngineToolCollection:
     """Manages a collection of ActionEngine tools with LangChain compatibility"""
 
     def __init__(self, tools: Optional[List[BaseTool]] = None):
-        self.tools: List[BaseTool] = []
+        # Insertion-ordered, so it doubles as the ordered tool list
         self.tool_map: Dict[str, BaseTool] = {}
+        # Per-tool invokers and schemas are bound once at registration
+        self._invokers: Dict[str, Callable[..., Awaitable[Any]]] = {}
+        self._schemas: Dict[str, Dict] = {}
+        self._tools_cache: Optional[List[BaseTool]] = None
+        self._schema_cache: Optional[List[Dict]] = None
+        self._schema_json: Optional[bytes] = None
 
         # Add any initial tools
         if tools:
@@ -42,13 +51,30 @@ class ActionEngineToolCollection:
         if tool.name in self.tool_map:
             raise ValueError(f"Tool with name {tool.name} already exists")
 
-        self.tools.append(tool)
         self.tool_map[tool.name] = tool
+        self._invokers[tool.name] = tool.ainvoke
+        self._schemas[tool.name] = convert_to_openai_tool(tool)
+        self._invalidate_caches()
 
     def remove_tool(self, name: str) -> None:
         """Remove a tool from the collection"""
-        if tool := self.tool_map.pop(name, None):
-            self.tools.remove(tool)
+        if self.tool_map.pop(name, None) is not None:
+            del self._invokers[name]
+            del self._schemas[name]
+            self._invalidate_caches()
+
+    def _invalidate_caches(self) -> None:
+        """Drop cached tool/schema lists and JSON after the tool set changes"""
+        self._tools_cache = None
+        self._schema_cache = None
+        self._schema_json = None
+
+    @property
+    def tools(self) -> List[BaseTool]:
+        """Tools in registration order"""
+        if self._tools_cache is None:
+            self._tools_cache = list(self.tool_map.values())
+        return self._tools_cache
 
     def get_tool(self, name: str) -> Optional[BaseTool]:
         """Get a tool by name"""
@@ -66,16 +92,19 @@ class ActionEngineToolCollection:
         self, name: str, input_dict: Any, config: Dict = None
     ) -> ToolResult:
         """Execute a tool by name with given parameters"""
-        tool = self.tool_map.get(name)
+        invoke = self._invokers.get(name)
 
         logger.info(f"Executing tool {name} with input: {input_dict}")
 
-        if not tool:
+        if invoke is None:
             return ToolResult(error=f"Tool {name} not found")
 
         try:
             # Let LangChain handle config injection via type hints
-            result = await tool.ainvoke(input_dict, config=config)
+            if config is None:
+                result = await invoke(input_dict)
+            else:
+                result = await invoke(input_dict, config=config)
             return (
                 result if isinstance(result, ToolResult) else ToolResult(output=result)
             )
@@ -84,30 +113,53 @@ class ActionEngineToolCollection:
             logger.error(f"Failed to execute {name}: {str(e)}")
             return ToolResult(error=str(e), system=f"Failed to execute {name}")
 
+    async def execute_tools(
+        self,
+        calls: List[Tuple[str, Any]],
+        config: Dict = None,
+        max_concurrency: int = 8,
+    ) -> List[ToolResult]:
+        """Execute several (name, input) tool calls concurrently.
+
+        Results come back in call order. execute_tool already turns failures
+        into error ToolResults, so one failing call does not cancel the rest.
+        """
+        sem = asyncio.Semaphore(max_concurrency)
+
+        async def _one(name: str, input_dict: Any) -> ToolResult:
+            async with sem:
+                return await self.execute_tool(name, input_dict, config=config)
+
+        return await asyncio.gather(*(_one(name, args) for name, args in calls))
+
+    async def execute_workable_tool_calls(
+        self,
+        tool_calls: List[WorkableToolCall],
+        config: Dict = None,
+        max_concurrency: int = 8,
+    ) -> List[ToolResult]:
+        """Execute independent workable tool calls concurrently, in call order"""
+        return await self.execute_tools(
+            [(tool_call.name, tool_call.args) for tool_call in tool_calls],
+            config=config,
+            max_concurrency=max_concurrency,
+        )
+
     def get_schemas(self) -> List[Dict]:
         """Get OpenAI function schemas for all tools"""
-        schemas = []
-        for tool in self.tools:
-            if isinstance(tool, BaseTool):
-                schemas.append(
-                    {
-                        "type": "function",
-                        "function": {
-                            "name": tool.name,
-                            "description": tool.description,
-                            "parameters": tool.parameters,
-                        },
-                    }
-                )
-            else:
-                # Handle LangChain tools
-                schemas.append(tool.metadata)
-        return schemas
+        if self._schema_cache is None:
+            self._schema_cache = list(self._schemas.values())
+        return self._schema_cache
+
+    def get_schemas_json(self) -> bytes:
+        """Get the tool schemas as compact, pre-encoded JSON"""
+        if self._schema_json is None:
+            self._schema_json = json.dumps(
+                self.get_schemas(), separators=(",", ":")
+            ).encode("utf-8")
+        return self._schema_json
 
     def validate_workable_tool_calls(self, tool_calls: List[WorkableToolCall]) -> bool:
         """Validate tool calls against available tools"""
-
-        for tool_call in tool_calls:
-            if tool_call.name not in self.tool_map:
-                return False
-        return True
+        tool_map = self.tool_map
+        return all(tool_call.name in tool_map for tool_call in tool_calls)
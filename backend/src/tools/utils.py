@@ -37,6 +37,32 @@ logger = logging.getLogger(__name__)
 T = TypeVar("T", bound=BaseModel)
 
 
+def _hydrate_ai_message(message: Dict[str, Any]) -> AIMessage:
+    return AIMessage(
+        content=message["content"],
+        tool_calls=message.get("tool_calls", []),
+        invalid_tool_calls=message.get("invalid_tool_calls", []),
+        usage_metadata=message.get("usage_metadata"),
+    )
+
+
+def _hydrate_tool_message(message: Dict[str, Any]) -> ToolMessage:
+    return ToolMessage(
+        content=message["content"],
+        tool_call_id=message.get("tool_call_id"),
+        tool_name=message.get("tool_name"),
+    )
+
+
+# Message constructors keyed by the serialized "type" field
+_HYDRATORS: Dict[str, Callable[[Dict[str, Any]], BaseMessage]] = {
+    "HumanMessage": lambda message: HumanMessage(content=message["content"]),
+    "SystemMessage": lambda message: SystemMessage(content=message["content"]),
+    "AIMessage": _hydrate_ai_message,
+    "ToolMessage": _hydrate_tool_message,
+}
+
+
 def hydrate_message(message: Dict[str, Any]) -> BaseMessage:
     """
     Hydrate a message dictionary into a LangChain message object.
@@ -50,25 +76,8 @@ def hydrate_message(message: Dict[str, Any]) -> BaseMessage:
     if "type" not in message or "content" not in message:
         raise ValueError("Message dictionary must have 'type' and 'content' fields")
 
-    if message["type"] == "HumanMessage":
-        return HumanMessage(content=message["content"])
-    elif message["type"] == "SystemMessage":
-        return SystemMessage(content=message["content"])
-    elif message["type"] == "AIMessage":
-        return AIMessage(
-            content=message["content"],
-            tool_calls=message.get("tool_calls", []),
-            invalid_tool_calls=message.get("invalid_tool_calls", []),
-            usage_metadata=message.get("usage_metadata"),
-        )
-    elif message["type"] == "ToolMessage":
-        return ToolMessage(
-            content=message["content"],
-            tool_call_id=message.get("tool_call_id"),
-            tool_name=message.get("tool_name"),
-        )
-    else:
-        return message
+    hydrate = _HYDRATORS.get(message["type"])
+    return hydrate(message) if hydrate else message
 
 
 def hydrate_messages(messages: List[Dict[str, Any]]) -> List[BaseMessage]:
@@ -84,29 +93,46 @@ def hydrate_messages(messages: List[Dict[str, Any]]) -> List[BaseMessage]:
     return [hydrate_message(m) for m in messages]
 
 
+def _serialize_base_message(message: BaseMessage) -> Dict[str, Any]:
+    return {"type": type(message).__name__, "content": message.content}
+
+
+def _serialize_ai_message(message: AIMessage) -> Dict[str, Any]:
+    base = _serialize_base_message(message)
+    if message.tool_calls:
+        base["tool_calls"] = message.tool_calls
+    if message.invalid_tool_calls:
+        base["invalid_tool_calls"] = message.invalid_tool_calls
+    if message.usage_metadata:
+        base["usage_metadata"] = message.usage_metadata
+    return base
+
+
+def _serialize_tool_message(message: ToolMessage) -> Dict[str, Any]:
+    base = _serialize_base_message(message)
+    base["tool_call_id"] = message.tool_call_id
+    base["tool_name"] = message.tool_name
+    return base
+
+
+# Serializers keyed by exact message class; subclasses resolve via isinstance
+_SERIALIZERS: Dict[type, Callable[[Any], Dict[str, Any]]] = {
+    HumanMessage: _serialize_base_message,
+    SystemMessage: _serialize_base_message,
+    AIMessage: _serialize_ai_message,
+    ToolMessage: _serialize_tool_message,
+}
+
+
 def serialize_message(message: BaseMessage) -> Dict[str, Any]:
     """Convert a message to a serializable format"""
-    base = {
-        "type": message.__class__.__name__,
-        "content": message.content,
-    }
-    # Handle additional fields for specific message types
-    if isinstance(message, ToolMessage):
-        base.update(
-            {
-                "tool_call_id": message.tool_call_id,
-                "tool_name": message.tool_name,
-            }
+    serializer = _SERIALIZERS.get(type(message))
+    if serializer is None:
+        serializer = next(
+            (fn for cls, fn in _SERIALIZERS.items() if isinstance(message, cls)),
+            _serialize_base_message,
         )
-    elif isinstance(message, AIMessage):
-        if hasattr(message, "tool_calls") and message.tool_calls:
-            base["tool_calls"] = message.tool_calls
-        if hasattr(message, "invalid_tool_calls") and message.invalid_tool_calls:
-            base["invalid_tool_calls"] = message.invalid_tool_calls
-        if hasattr(message, "usage_metadata") and message.usage_metadata:
-            base["usage_metadata"] = message.usage_metadata
-
-    return base
+    return serializer(message)
 
 
 def serialize_messages(messages: List[BaseMessage]) -> List[Dict[str, Any]]:
@@ -122,7 +148,7 @@ def serialize_messages(messages: List[BaseMessage]) -> List[Dict[str, Any]]:
     return [serialize_message(m) for m in messages]
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ExecutorPromptContext:
     terminal_windows: str
     clickable_elements: str
@@ -175,16 +201,16 @@ async def get_executor_system_prompt_context(
     sum of all of the context that the agent needs to take action in its environments
     """
 
-    terminal_windows = (
-        await config["configurable"].get("terminal_manager").list_terminals()
-    )
-
     browser_context = config["configurable"].get("browser_context")
     if not browser_context:
         logger.info(f"Browser context: {browser_context}")
         raise TypeError("Browser context is not an instance of CustomBrowserContext")
 
-    browser_state: BrowserState = await browser_context.get_state(use_vision=True)
+    # Terminal listing and browser state are independent, so fetch them together
+    terminal_windows, browser_state = await asyncio.gather(
+        config["configurable"].get("terminal_manager").list_terminals(),
+        browser_context.get_state(use_vision=True),
+    )
     if not isinstance(browser_state, BrowserState):
         logger.info(f"Browser state: {browser_state}")
         raise TypeError("Browser state is not an instance of BrowserState")
@@ -204,7 +230,7 @@ async def get_executor_system_prompt_context(
 
     return ExecutorPromptContext(
         terminal_windows=json.dumps(terminal_windows),
-        clickable_elements=str(clickable_elements),
+        clickable_elements=clickable_elements,
         browser_tabs=str(browser_tabs),
         current_date=current_date,
         screenshot=screenshot,
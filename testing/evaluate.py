@@ -13,31 +13,21 @@
 # limitations under the License.
 #
 # SPDX-License-Identifier: Apache-2.0"
+import asyncio
+import copy
+import inspect
+from functools import lru_cache
+
 from deepeval.metrics import GEval
 from deepeval.test_case import LLMTestCaseParams, LLMTestCase
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from dotenv import load_dotenv
 
 load_dotenv()
 
-
-def evaluate_actions(
-    task: str, actual_actions: List[str], expected_actions: List[str]
-) -> GEval:
-    """
-    Compare expected and actual actions using Geval.
-
-    Args:
-        task: The task description
-        actual_actions: List of actual action representations
-        expected_actions: List of expected action representations
-
-    Returns:
-        GEval metric object containing score and reason
-    """
-    correctness_metric = GEval(
-        name="Correctness",
-        criteria="""You are evaluating if two action sequences are equivalent. When comparing element types in action representations, consider the following equivalences:
+# cleandoc strips the source indentation so it is not sent to the evaluator
+_CORRECTNESS_CRITERIA = inspect.cleandoc(
+    """You are evaluating if two action sequences are equivalent. When comparing element types in action representations, consider the following equivalences:
 
                     1. Input/Interaction elements:
                     - [input], [textbox], and [searchbox] when used with TYPE action are equivalent
@@ -51,7 +41,16 @@ def evaluate_actions(
                     - Custom elements like [adc-button], [hp-input-button] should be judged based on their semantic role (e.g., if it's used as a button, treat it as [button])
 
                     Focus on whether they achieve the same interactions, not whether they use identical element types.
-                    """,
+                    """
+)
+
+
+@lru_cache(maxsize=1)
+def _correctness_metric_template() -> GEval:
+    """Build the Correctness GEval metric once; callers get shallow copies"""
+    return GEval(
+        name="Correctness",
+        criteria=_CORRECTNESS_CRITERIA,
         evaluation_params=[
             LLMTestCaseParams.INPUT,
             LLMTestCaseParams.ACTUAL_OUTPUT,
@@ -59,6 +58,24 @@ def evaluate_actions(
         ],
     )
 
+
+def evaluate_actions(
+    task: str, actual_actions: List[str], expected_actions: List[str]
+) -> GEval:
+    """
+    Compare expected and actual actions using Geval.
+
+    Args:
+        task: The task description
+        actual_actions: List of actual action representations
+        expected_actions: List of expected action representations
+
+    Returns:
+        GEval metric object containing score and reason
+    """
+    # Copy so each result keeps its own score and reason
+    correctness_metric = copy.copy(_correctness_metric_template())
+
     test_case = LLMTestCase(
         input=task,
         actual_output=actual_actions,
@@ -67,3 +84,31 @@ def evaluate_actions(
 
     correctness_metric.measure(test_case)
     return correctness_metric
+
+
+async def evaluate_actions_batch(
+    items: List[Tuple[str, List[str], List[str]]],
+) -> List[GEval]:
+    """
+    Evaluate several (task, actual_actions, expected_actions) cases concurrently.
+
+    Args:
+        items: Tuples of task description, actual and expected action representations
+
+    Returns:
+        GEval metric objects, one per item and in the same order
+    """
+    metrics = [copy.copy(_correctness_metric_template()) for _ in items]
+    await asyncio.gather(
+        *(
+            metric.a_measure(
+                LLMTestCase(
+                    input=task,
+                    actual_output=actual_actions,
+                    expected_output=expected_actions,
+                )
+            )
+            for metric, (task, actual_actions, expected_actions) in zip(metrics, items)
+        )
+    )
+    return metrics
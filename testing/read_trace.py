@@ -16,11 +16,100 @@
 from dotenv import load_dotenv
 from langsmith import Client
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 import json
+from json_utils import json_loads
 from datetime import datetime
+from functools import lru_cache
 import os
 import re
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, NamedTuple, Optional, Any, Tuple, Union
+
+# Attribute patterns used when classifying and describing elements
+_ROLE_RE = re.compile(r'role="([^"]+)"')
+_TYPE_RE = re.compile(r'type="([^"]+)"')
+_CONTENT_RE = re.compile(r">\s*([^<>]+?)\s*<")
+_ARIA_LABEL_RE = re.compile(r'aria-label="([^"]+)"')
+_TEXT_RE = re.compile(r'text="([^"]+)"')
+_PLACEHOLDER_RE = re.compile(r'placeholder="([^"]+)"')
+_TITLE_RE = re.compile(r'title="([^"]+)"')
+_NAME_RE = re.compile(r'name="([^"]+)"')
+_ID_RE = re.compile(r'id="([^"]+)"')
+_QUOTED_RE = re.compile(r'"([^"]+)"')
+_ID_TOKEN_RE = re.compile(r"[A-Z][a-z]*|[^A-Z_]+")
+# Marks the end of the clickable elements section in the executor prompt
+_PIXELS_BELOW_RE = re.compile(
+    r"\.\.\. \d+ pixels below - you can scroll to see more \.\.\."
+)
+
+_LIST_RUNS_WORKERS = 8
+
+_ELEMENTS_START_MARKER = (
+    "## Clickable elements\n"
+    "The clickable elements within the currently selected browser tab.\n\n"
+)
+_DESCRIPTION_NOT_FOUND = "Description not found"
+
+# High frequency roles from Mind2Web
+_SEMANTIC_ROLES = frozenset(
+    {
+        "button",
+        "checkbox",
+        "gridcell",
+        "listbox",
+        "menuitem",
+        "option",
+        "radio",
+        "searchbox",
+        "tab",
+        "textbox",
+        "combobox",
+    }
+)
+_INPUT_TYPE_MAPPING = {
+    "search": "searchbox",
+    "text": "textbox",
+    "checkbox": "checkbox",
+    "radio": "radio",
+}
+_TAG_MAPPING = {
+    "a": "link",  # Very common (1569 occurrences)
+    "button": "button",  # Most common (2017 occurrences)
+    "input": "textbox",  # Common form element
+    "select": "combobox",  # Common form element (369 occurrences)
+    "img": "image",  # Common media type
+    "textarea": "textbox",
+}
+# Common Mind2Web types kept as-is when they appear as tags
+_COMMON_TAGS = frozenset(
+    {
+        "button",
+        "checkbox",
+        "combobox",
+        "div",
+        "link",
+        "listbox",
+        "option",
+        "radio",
+        "searchbox",
+        "textbox",
+    }
+)
+# Leading tag, matched only when it maps to or already is a Mind2Web type, so
+# the alternation does the whitelist test; longest names first for clarity
+_KNOWN_TAG_RE = re.compile(
+    r"<(%s)\b"
+    % "|".join(sorted(_TAG_MAPPING.keys() | _COMMON_TAGS, key=lambda t: (-len(t), t))),
+    re.IGNORECASE,
+)
+# Attributes tried in order when there is no visible text content
+_DESCRIPTION_ATTR_RES = (
+    _ARIA_LABEL_RE,
+    _TEXT_RE,
+    _PLACEHOLDER_RE,
+    _TITLE_RE,
+    _NAME_RE,
+)
 
 
 def extract_element_type(element_desc: str) -> str:
@@ -33,72 +122,27 @@ def extract_element_type(element_desc: str) -> str:
     4. Original tag if in common types
     5. Fallback to generic
     """
-    if not element_desc or element_desc == "Description not found":
+    if not element_desc or element_desc == _DESCRIPTION_NOT_FOUND:
         return "browser"
 
-    # Check for semantic roles first
-    role_match = re.search(r'role="([^"]+)"', element_desc) or re.search(
-        r'aria-role="([^"]+)"', element_desc
-    )
+    # Check for semantic roles first; this also matches aria-role="..."
+    role_match = _ROLE_RE.search(element_desc)
     if role_match:
         role = role_match.group(1).lower()
-        # High frequency roles from Mind2Web
-        if role in {
-            "button",
-            "checkbox",
-            "gridcell",
-            "listbox",
-            "menuitem",
-            "option",
-            "radio",
-            "searchbox",
-            "tab",
-            "textbox",
-            "combobox",
-        }:
+        if role in _SEMANTIC_ROLES:
             return role
 
     # Check for input type
-    type_match = re.search(r'type="([^"]+)"', element_desc)
+    type_match = _TYPE_RE.search(element_desc)
     if type_match:
         input_type = type_match.group(1).lower()
-        type_mapping = {
-            "search": "searchbox",
-            "text": "textbox",
-            "checkbox": "checkbox",
-            "radio": "radio",
-        }
-        return type_mapping.get(input_type, input_type)
-
-    # Map HTML tags to most common Mind2Web types
-    tag_match = re.match(r"<(\w+)", element_desc)
+        return _INPUT_TYPE_MAPPING.get(input_type, input_type)
+
+    # Map HTML tags to most common Mind2Web types, keeping common types as-is
+    tag_match = _KNOWN_TAG_RE.match(element_desc)
     if tag_match:
         tag = tag_match.group(1).lower()
-        tag_mapping = {
-            "a": "link",  # Very common (1569 occurrences)
-            "button": "button",  # Most common (2017 occurrences)
-            "input": "textbox",  # Common form element
-            "select": "combobox",  # Common form element (369 occurrences)
-            "img": "image",  # Common media type
-            "textarea": "textbox",
-        }
-        if tag in tag_mapping:
-            return tag_mapping[tag]
-
-        # If tag is in common Mind2Web types, keep it
-        if tag in {
-            "button",
-            "checkbox",
-            "combobox",
-            "div",
-            "link",
-            "listbox",
-            "option",
-            "radio",
-            "searchbox",
-            "textbox",
-        }:
-            return tag
+        return _TAG_MAPPING.get(tag, tag)
 
     return "generic"  # Default fallback
 
@@ -108,51 +152,29 @@ def extract_element_description(element_desc: str) -> str:
     Create a readable description from the element description.
     Prioritizes visible text content and semantic attributes.
     """
-    if not element_desc or element_desc == "Description not found":
+    if not element_desc or element_desc == _DESCRIPTION_NOT_FOUND:
         return ""
 
     # Extract visible text content first - often most meaningful
-    content_pattern = re.compile(r">\s*([^<>]+?)\s*<")
-    content_matches = content_pattern.findall(element_desc)
+    content_matches = _CONTENT_RE.findall(element_desc)
     if content_matches:
         # Join multiple text segments, clean up whitespace
         text = " ".join(match.strip() for match in content_matches if match.strip())
         if text:
             return text
 
-    # Extract aria label which often has meaningful descriptions
-    aria_label = re.search(r'aria-label="([^"]+)"', element_desc)
-    if aria_label:
-        return aria_label.group(1)
-
-    # Extract text attribute if present
-    text_match = re.search(r'text="([^"]+)"', element_desc)
-    if text_match:
-        return text_match.group(1)
-
-    # Extract placeholder which often contains helpful text
-    placeholder = re.search(r'placeholder="([^"]+)"', element_desc)
-    if placeholder:
-        return placeholder.group(1)
-
-    # Extract title attribute which may have descriptive text
-    title = re.search(r'title="([^"]+)"', element_desc)
-    if title:
-        return title.group(1)
-
-    # Extract name attribute if present
-    name_match = re.search(r'name="([^"]+)"', element_desc)
-    if name_match:
-        return name_match.group(1)
+    # Aria label, text, placeholder, title and name often carry descriptions
+    for pattern in _DESCRIPTION_ATTR_RES:
+        attr_match = pattern.search(element_desc)
+        if attr_match:
+            return attr_match.group(1)
 
     # Extract id attribute if present, clean up camelCase/snake_case
-    id_match = re.search(r'id="([^"]+)"', element_desc)
+    id_match = _ID_RE.search(element_desc)
     if id_match:
         id_text = id_match.group(1)
         # Split on camelCase and snake_case
-        words = re.split("([A-Z][a-z]*)|_", id_text)
-        # Clean and join words
-        cleaned = " ".join(word for word in words if word)
+        cleaned = " ".join(_ID_TOKEN_RE.findall(id_text))
         if cleaned:
             return cleaned.title()
 
@@ -163,36 +185,90 @@ def extract_element_description(element_desc: str) -> str:
         return "Search"
 
     # Extract any other text within quotation marks as a last resort
-    quoted_text = re.search(r'"([^"]+)"', element_desc)
+    quoted_text = _QUOTED_RE.search(element_desc)
     if quoted_text:
         return quoted_text.group(1)
 
     return "element"
 
 
-def format_action_repr(tool_call: Dict, element_desc: str) -> Optional[str]:
+@lru_cache(maxsize=4096)
+def _parse_element_desc(element_desc: str) -> Tuple[str, str]:
+    """Classify and describe an element: (element type, description).
+
+    Memoized per process: the same navbar or search box recurs across many
+    steps of a trace, and the result is an immutable tuple of strings.
     """
-    Format a tool call and element description into action_reprs format.
+    return (
+        extract_element_type(element_desc),
+        extract_element_description(element_desc),
+    )
+
+
+def _element_index_key(index: Any) -> Any:
+    """Normalize a tool call's element index to the int keys used for lookups.
+
+    Traces may record the index as 5 or "5"; both must find the same element.
     """
-    action = tool_call.get("args", {}).get("action", "")
+    if isinstance(index, str) and index.isdecimal():
+        return int(index)
+    return index
 
-    if action == "new_tab":
-        url = tool_call.get("args", {}).get("url", "")
-        domain = url.split("//")[-1].split("/")[0].replace("www.", "")
-        return f"[browser] {domain.capitalize()} -> NAVIGATE: {url}"
 
-    elif action == "click":
-        element_type = extract_element_type(element_desc)
-        description = extract_element_description(element_desc)
-        return f"[{element_type}] {description} -> CLICK"
+@lru_cache(maxsize=128)
+def _parse_elements_section(section: str) -> Dict[int, str]:
+    """Map element index to description for a clickable elements section.
 
-    elif action == "input_text":
-        element_type = extract_element_type(element_desc)
-        description = extract_element_description(element_desc)
-        text = tool_call.get("args", {}).get("text", "")
-        return f"[{element_type}] {description} -> TYPE: {text}"
+    Cached, so an unchanged page DOM is parsed once; treat the result as
+    read-only.
+    """
+    element_dict = {}
+    for line in section.split("\n"):
+        idx, sep, desc = line.partition("[:]")
+        # Non-interactive elements are marked "_" rather than numbered
+        if sep and idx.isdecimal():
+            element_dict[int(idx)] = desc.strip()
+    return element_dict
 
-    return None
+
+def _describe_element(element_desc: Optional[str]) -> Tuple[str, str]:
+    """Element type and description, skipping the parser for missing ones."""
+    if not element_desc or element_desc == _DESCRIPTION_NOT_FOUND:
+        return "browser", ""
+    return _parse_element_desc(element_desc)
+
+
+def _format_new_tab(tool_call: Dict, element_desc: Optional[str]) -> str:
+    url = tool_call["args"].get("url", "")
+    domain = url.rpartition("//")[2].partition("/")[0].replace("www.", "")
+    return f"[browser] {domain.capitalize()} -> NAVIGATE: {url}"
+
+
+def _format_click(tool_call: Dict, element_desc: Optional[str]) -> str:
+    element_type, description = _describe_element(element_desc)
+    return f"[{element_type}] {description} -> CLICK"
+
+
+def _format_input_text(tool_call: Dict, element_desc: Optional[str]) -> str:
+    element_type, description = _describe_element(element_desc)
+    text = tool_call["args"].get("text", "")
+    return f"[{element_type}] {description} -> TYPE: {text}"
+
+
+# Add a formatter here to support another browser action
+_ACTION_FORMATTERS = {
+    "new_tab": _format_new_tab,
+    "click": _format_click,
+    "input_text": _format_input_text,
+}
+
+
+def format_action_repr(tool_call: Dict, element_desc: str) -> Optional[str]:
+    """
+    Format a tool call and element description into action_reprs format.
+    """
+    formatter = _ACTION_FORMATTERS.get(tool_call.get("args", {}).get("action", ""))
+    return formatter(tool_call, element_desc) if formatter else None
 
 
 def tool_calls_to_action_reprs(tool_calls_list, element_descriptions=None):
@@ -212,7 +288,7 @@ def tool_calls_to_action_reprs(tool_calls_list, element_descriptions=None):
     if isinstance(tool_calls_list, str):
         try:
             cleaned_json = tool_calls_list.replace("'", '"').replace('""', '"')
-            tool_calls_list = json.loads(cleaned_json)
+            tool_calls_list = json_loads(cleaned_json)
         except json.JSONDecodeError as e:
             print(f"Error parsing tool calls: {e}")
             return []
@@ -238,7 +314,10 @@ def tool_calls_to_action_reprs(tool_calls_list, element_descriptions=None):
                 if index is not None:
                     # If element_descriptions is a dict mapping indices to descriptions
                     if isinstance(element_descriptions, dict):
-                        element_desc = element_descriptions.get(index)
+                        key = _element_index_key(index)
+                        element_desc = element_descriptions.get(
+                            key, element_descriptions.get(index)
+                        )
                     # If it's a single element description for the current tool call
                     elif isinstance(element_descriptions, str):
                         element_desc = element_descriptions
@@ -274,39 +353,43 @@ def convert_direct_inputs_to_action_reprs(tool_call, element_desc=None):
     return None
 
 
-def extract_run_info(run):
-    """Extract relevant fields from a run object."""
-    info = {
-        "id": str(run.id) if hasattr(run, "id") else None,
-        "name": run.name if hasattr(run, "name") else None,
-        "run_type": run.run_type if hasattr(run, "run_type") else None,
-        "start_time": (
-            str(run.start_time)
-            if hasattr(run, "start_time") and run.start_time
-            else None
-        ),
-        "end_time": (
-            str(run.end_time) if hasattr(run, "end_time") and run.end_time else None
-        ),
-        "status": run.status if hasattr(run, "status") else None,
-        "error": str(run.error) if hasattr(run, "error") and run.error else None,
-        "inputs": run.inputs if hasattr(run, "inputs") else None,
-        "outputs": run.outputs if hasattr(run, "outputs") else None,
-        "tags": run.tags if hasattr(run, "tags") else None,
-    }
+class RunInfo(NamedTuple):
+    """Relevant fields of a LangSmith run; use ``_asdict()`` for a plain dict."""
+
+    id: str
+    name: Optional[str]
+    run_type: Optional[str]
+    start_time: Optional[str]
+    end_time: Optional[str]
+    status: Optional[str]
+    error: Optional[str]
+    inputs: Optional[Dict[str, Any]]
+    outputs: Optional[Dict[str, Any]]
+    tags: Optional[List[str]]
+    execution_time: Optional[float]
 
-    # Calculate execution time if both start and end times are available
-    if info["start_time"] and info["end_time"]:
-        try:
-            start = datetime.fromisoformat(info["start_time"].replace("Z", "+00:00"))
-            end = datetime.fromisoformat(info["end_time"].replace("Z", "+00:00"))
-            info["execution_time"] = (end - start).total_seconds()
-        except (ValueError, TypeError):
-            info["execution_time"] = None
-    else:
-        info["execution_time"] = None
 
-    return info
+def extract_run_info(run) -> RunInfo:
+    """Extract relevant fields from a run object."""
+    start_time = run.start_time
+    end_time = run.end_time
+    # LangSmith Run objects always define these fields, so read them directly
+    return RunInfo(
+        id=str(run.id),
+        name=run.name,
+        run_type=run.run_type,
+        start_time=str(start_time) if start_time else None,
+        end_time=str(end_time) if end_time else None,
+        status=run.status,
+        error=str(run.error) if run.error else None,
+        inputs=run.inputs,
+        outputs=run.outputs,
+        tags=run.tags,
+        # Subtract the datetimes directly rather than re-parsing their strings
+        execution_time=(
+            (end_time - start_time).total_seconds() if start_time and end_time else None
+        ),
+    )
 
 
 def get_run_trace(run_id):
@@ -318,24 +401,32 @@ def get_run_trace(run_id):
     # Get all child runs (steps in the trace)
     child_runs = list(client.list_runs(parent_run_id=run_id))
 
-    # For tool_selection runs, get their LLM child runs
+    # For tool_selection runs, get their LLM child runs; each is a separate
+    # HTTP round trip, so fetch them concurrently
+    tool_selection_ids = [
+        child_run.id for child_run in child_runs if child_run.name == "tool_selection"
+    ]
+    with ThreadPoolExecutor(max_workers=_LIST_RUNS_WORKERS) as executor:
+        nested_by_parent = dict(
+            zip(
+                tool_selection_ids,
+                executor.map(
+                    lambda parent_id: list(client.list_runs(parent_run_id=parent_id)),
+                    tool_selection_ids,
+                ),
+            )
+        )
+
     all_child_runs = []
     for child_run in child_runs:
         all_child_runs.append(child_run)
         if child_run.name == "tool_selection":
-            # Get nested child runs that are LLM type
-            nested_runs = list(client.list_runs(parent_run_id=child_run.id))
-            llm_runs = [run for run in nested_runs if run.run_type == "llm"]
-            all_child_runs.extend(llm_runs)
+            # Keep nested child runs that are LLM type
+            nested_runs = nested_by_parent[child_run.id]
+            all_child_runs.extend(run for run in nested_runs if run.run_type == "llm")
 
     # Sort all runs by start time
-    all_child_runs.sort(
-        key=lambda run: (
-            run.start_time
-            if hasattr(run, "start_time") and run.start_time
-            else datetime.min
-        )
-    )
+    all_child_runs.sort(key=lambda run: run.start_time or datetime.min)
 
     trace_data = {
         "main_run": extract_run_info(run),
@@ -360,44 +451,44 @@ def process_trace_data(trace, output_path=None):
 
     # Print main run summary
     print(f"\n{'='*50}")
-    print(f"Main Run: {trace['main_run']['name']} (ID: {trace['main_run']['id']})")
-    print(f"Status: {trace['main_run']['status']}")
+    print(f"Main Run: {trace['main_run'].name} (ID: {trace['main_run'].id})")
+    print(f"Status: {trace['main_run'].status}")
     print(f"Total steps: {len(trace['child_runs'])}")
     print(f"{'='*50}")
 
     # Print each step (child run) in the trace as a summary
     print(f"\nTrace Steps Summary:\n")
     for i, child in enumerate(trace["child_runs"], 1):
-        exec_time = (
-            f"{child['execution_time']:.3f}s" if child["execution_time"] else "N/A"
-        )
+        exec_time = f"{child.execution_time:.3f}s" if child.execution_time else "N/A"
         # print(
-        #     f"{i}. {child['name']} ({child['run_type']}) - {child['status']} - {exec_time}"
+        #     f"{i}. {child.name} ({child.run_type}) - {child.status} - {exec_time}"
         # )
 
-        if child["name"] == "tool_selection":
-            tool_call = child["inputs"]["tool_calls"][0]
-            print(f"Action picked through tool call: {child['inputs']['tool_calls']}")
-
-        if child["name"] == "ChatOpenAI" and tool_call.get("name") == "browser_use":
-            content = child["inputs"]["messages"][0][0]["kwargs"]["content"][0]["text"]
-            start_marker = "## Clickable elements\nThe clickable elements within the currently selected browser tab.\n\n"
-            if start_marker in content:
-                elements_section = content.split(start_marker)[1]
-                end_pattern = (
-                    r"\.\.\. \d+ pixels below - you can scroll to see more \.\.\."
+        if child.name == "tool_selection":
+            tool_call = child.inputs["tool_calls"][0]
+            print(f"Action picked through tool call: {child.inputs['tool_calls']}")
+
+        if child.name == "ChatOpenAI" and tool_call.get("name") == "browser_use":
+            content = child.inputs["messages"][0][0]["kwargs"]["content"][0]["text"]
+            marker_idx = content.find(_ELEMENTS_START_MARKER)
+            if marker_idx != -1:
+                # Text between this marker and the next one, as split()[1] gave
+                section_start = marker_idx + len(_ELEMENTS_START_MARKER)
+                section_end = content.find(_ELEMENTS_START_MARKER, section_start)
+                elements_section = (
+                    content[section_start:]
+                    if section_end == -1
+                    else content[section_start:section_end]
+                )
+                match = (
+                    _PIXELS_BELOW_RE.search(elements_section)
+                    if "pixels below - you can scroll" in elements_section
+                    else None
                 )
-                match = re.search(end_pattern, elements_section)
                 if match:
                     elements_section = elements_section[: match.start()].strip()
 
-                    # Parse elements into a dictionary
-                    element_dict = {}
-                    for line in elements_section.split("\n"):
-                        if "[:]" in line:
-                            idx, desc = line.split("[:]", 1)
-                            if idx != "_":  # Skip non-interactive elements
-                                element_dict[idx] = desc.strip()
+                    element_dict = _parse_elements_section(elements_section)
 
             # Check if it's a browser_use action with an index
             if (
@@ -405,10 +496,10 @@ def process_trace_data(trace, output_path=None):
                 and "args" in tool_call
                 and "index" in tool_call["args"]
             ):
-                index = str(
-                    tool_call["args"]["index"]
-                )  # Convert index to string since our dict keys are strings
-                element_desc = element_dict.get(index, "Description not found")
+                element_desc = element_dict.get(
+                    _element_index_key(tool_call["args"]["index"]),
+                    _DESCRIPTION_NOT_FOUND,
+                )
                 action_repr = convert_direct_inputs_to_action_reprs(
                     tool_call, element_desc
                 )
@@ -15,14 +15,14 @@
 # SPDX-License-Identifier: Apache-2.0"
 import asyncio
 import argparse
-import json
+from json_utils import json_dumps, json_loads
 import os
 import sys
 from websocket_automation_script import WebAutomation
 from read_trace import get_run_trace, process_trace_data
 from evaluate import evaluate_actions
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Any, BinaryIO, Dict, List, Optional
 
 
 async def run_task_and_get_runid(
@@ -45,8 +45,8 @@ async def run_task_and_get_runid(
 
     # Load the output file to get run_id
     try:
-        with open(output_file, "r") as f:
-            output_data = json.load(f)
+        with open(output_file, "rb") as f:
+            output_data = json_loads(f.read())
             run_id = output_data.get("run_id")
             status = output_data.get("status")
 
@@ -88,7 +88,7 @@ async def process_task_trace(task_data: Dict[str, Any]) -> Optional[Dict[str, An
 
     # Read trace from langsmith
     print("\n1. Reading Trace from Langsmith...")
-    trace_data = get_run_trace(run_id)
+    trace_data = await asyncio.to_thread(get_run_trace, run_id)
 
     if not trace_data or "child_runs" not in trace_data:
         print("Error: Failed to get valid trace data")
@@ -99,7 +99,7 @@ async def process_task_trace(task_data: Dict[str, Any]) -> Optional[Dict[str, An
         return task_data
 
     try:
-        action_reprs = process_trace_data(trace_data)
+        action_reprs = await asyncio.to_thread(process_trace_data, trace_data)
         task_data["action_repr_output"] = action_reprs if action_reprs else []
     except Exception as e:
         print(f"Error processing trace: {str(e)}")
@@ -120,7 +120,8 @@ async def process_task_trace(task_data: Dict[str, Any]) -> Optional[Dict[str, An
             task_data["decision"] = "No actions were extracted from the trace"
             task_data["error"] = "No actions extracted"
         else:
-            correctness_metric = evaluate_actions(
+            correctness_metric = await asyncio.to_thread(
+                evaluate_actions,
                 task_data["task"],
                 task_data["action_repr_output"],
                 task_data["action_reprs"],
@@ -143,8 +144,8 @@ async def save_output(tasks_data: List[Dict[str, Any]], output_dir: str):
     """
     try:
         output_file = os.path.join(output_dir, "output.json")
-        with open(output_file, "w") as f:
-            json.dump(tasks_data, f, indent=2)
+        with open(output_file, "wb") as f:
+            f.write(json_dumps(tasks_data, indent=True))
         print(f"\nOutput saved to: {output_file}")
         return output_file
     except Exception as e:
@@ -152,9 +153,28 @@ async def save_output(tasks_data: List[Dict[str, Any]], output_dir: str):
         return None
 
 
-async def run_automated_flow(url: str, input_json_path: str, output_dir: str = "data"):
+async def append_output_jsonl(task_data: Dict[str, Any], progress_log: BinaryIO):
+    """
+    Append one task record to the open output.jsonl progress log.
+    """
+    try:
+        progress_log.write(json_dumps(task_data) + b"\n")
+    except Exception as e:
+        print(f"Error appending output: {str(e)}")
+
+
+async def run_automated_flow(
+    url: str,
+    input_json_path: str,
+    output_dir: str = "data",
+    task_concurrency: int = 1,
+    trace_concurrency: int = 8,
+):
     """
     Run the complete automation flow for all tasks in the input JSON.
+
+    Tasks run one at a time by default because they share the backend's single
+    browser; trace processing and evaluation are independent and run in parallel.
     """
     print("\n=== Starting Automated Flow ===")
 
@@ -163,40 +183,62 @@ async def run_automated_flow(url: str, input_json_path: str, output_dir: str = "
 
     # Load input tasks
     try:
-        with open(input_json_path, "r") as f:
-            tasks_data = json.load(f)
+        with open(input_json_path, "rb") as f:
+            tasks_data = json_loads(f.read())
     except Exception as e:
         print(f"Error loading input JSON: {str(e)}")
         return False
 
-    tasks_in_progress = []
-
-    # Phase 1: Run all tasks and get run_ids
-    print("\n=== Phase 1: Running Tasks and Collecting Run IDs ===")
-    for task_data in tasks_data:
-        try:
-            enriched_task = await run_task_and_get_runid(url, task_data, output_dir)
+    # Start a fresh progress log and keep it open for the whole run; unbuffered,
+    # so each line lands in one write. output.json is written after each phase.
+    with open(
+        os.path.join(output_dir, "output.jsonl"), "wb", buffering=0
+    ) as progress_log:
+        # Phase 1: Run all tasks and get run_ids
+        print("\n=== Phase 1: Running Tasks and Collecting Run IDs ===")
+        # Slots keep input order while tasks finish in any order
+        enriched_tasks: List[Optional[Dict[str, Any]]] = [None] * len(tasks_data)
+        task_sem = asyncio.Semaphore(task_concurrency)
+
+        async def _run_task(i: int, task_data: Dict[str, Any]) -> None:
+            async with task_sem:
+                try:
+                    enriched_task = await run_task_and_get_runid(
+                        url, task_data, output_dir
+                    )
+                except Exception as e:
+                    print(f"Error processing task: {str(e)}")
+                    return
             if enriched_task:
-                tasks_in_progress.append(enriched_task)
-                # Update output file after each task
-                await save_output(tasks_in_progress, output_dir)
-        except Exception as e:
-            print(f"Error processing task: {str(e)}")
-            continue
-
-    # Phase 2: Process traces and run evaluations
-    print("\n=== Phase 2: Processing Traces and Running Evaluations ===")
-    for i, task_data in enumerate(tasks_in_progress):
-        try:
-            processed_task = await process_task_trace(task_data)
+                enriched_tasks[i] = enriched_task
+                # Log progress after each task
+                await append_output_jsonl(enriched_task, progress_log)
+
+        await asyncio.gather(*(_run_task(i, td) for i, td in enumerate(tasks_data)))
+        tasks_in_progress = [t for t in enriched_tasks if t]
+        await save_output(tasks_in_progress, output_dir)
+
+        # Phase 2: Process traces and run evaluations
+        print("\n=== Phase 2: Processing Traces and Running Evaluations ===")
+        trace_sem = asyncio.Semaphore(trace_concurrency)
+
+        async def _process_trace(i: int, task_data: Dict[str, Any]) -> None:
+            async with trace_sem:
+                try:
+                    processed_task = await process_task_trace(task_data)
+                except Exception as e:
+                    print(f"Error processing trace: {str(e)}")
+                    return
             if processed_task:
                 # Update task in place
                 tasks_in_progress[i] = processed_task
-                # Update output file after each processed task
-                await save_output(tasks_in_progress, output_dir)
-        except Exception as e:
-            print(f"Error processing trace: {str(e)}")
-            continue
+                # Log progress after each processed task
+                await append_output_jsonl(processed_task, progress_log)
+
+        await asyncio.gather(
+            *(_process_trace(i, td) for i, td in enumerate(tasks_in_progress))
+        )
+        await save_output(tasks_in_progress, output_dir)
 
     if tasks_in_progress:
         print("\n=== Automation Flow Completed ===")
@@ -216,11 +258,39 @@ def main():
     parser.add_argument(
         "--output-dir", default="data", help="Directory to store output files"
     )
+    parser.add_argument(
+        "--task-concurrency",
+        type=int,
+        default=1,
+        help="Tasks to run against the backend at once",
+    )
+    parser.add_argument(
+        "--trace-concurrency",
+        type=int,
+        default=8,
+        help="Traces to process and evaluate at once",
+    )
 
     args = parser.parse_args()
 
     try:
-        asyncio.run(run_automated_flow(args.url, args.input_json, args.output_dir))
+        # Optional faster event loop for the websocket receive loop
+        import uvloop
+
+        uvloop.install()
+    except ImportError:
+        pass
+
+    try:
+        asyncio.run(
+            run_automated_flow(
+                args.url,
+                args.input_json,
+                args.output_dir,
+                task_concurrency=args.task_concurrency,
+                trace_concurrency=args.trace_concurrency,
+            )
+        )
     except Exception as e:
         print(f"Error during automation: {str(e)}")
         sys.exit(1)
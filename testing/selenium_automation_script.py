@@ -14,21 +14,62 @@
 #
 # SPDX-License-Identifier: Apache-2.0"
 from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
 import json
 import argparse
 from datetime import datetime
 import time
 import logging
+import os
+import re
+import signal
+import threading
+
+MESSAGE_SELECTOR = "div[class*='text-l text-[#f7f7f7]']"
+
+# Seconds to wait for driver.quit() before killing chromedriver and Chrome
+QUIT_TIMEOUT = 10
+
+# Queue [index, text] for each chat message whenever its text changes, so
+# polling is one script call instead of a find_elements plus a call per .text.
+# Replies stream in after the node is inserted, so text edits are observed
+# too and a message is re-queued under the same index as it grows.
+OBSERVE_MESSAGES_JS = """
+const selector = arguments[0];
+window.__newMsgs = [];
+let count = 0;
+new MutationObserver(() => {
+    document.querySelectorAll(selector).forEach((node) => {
+        const text = node.innerText.trim();
+        if (!text || text === node.__text) {
+            return;
+        }
+        if (node.__index === undefined) {
+            node.__index = count++;
+        }
+        node.__text = text;
+        window.__newMsgs.push([node.__index, text]);
+    });
+}).observe(document.body, {childList: true, subtree: true, characterData: true});
+"""
+TAKE_NEW_MESSAGES_JS = "return (window.__newMsgs || []).splice(0);"
+
+# Any of these in one of the last messages means the task is done
+COMPLETION_INDICATORS = ["Task completed", "Done", "Finished", "GraphRecursionError"]
+_COMPLETION_RE = re.compile("|".join(map(re.escape, COMPLETION_INDICATORS)))
 
 
 class WebAutomation:
-    def __init__(self, url, task):
+    def __init__(self, url, task, pretty=False):
         self.url = url
         self.task = task
+        # Results are machine-read by default, so written compact
+        self.pretty = pretty
         self.driver = None
         self.chat_output = []
         self.setup_logging()
@@ -44,8 +85,15 @@ class WebAutomation:
         try:
             options = webdriver.ChromeOptions()
             options.add_argument("--start-maximized")
-            self.driver = webdriver.Chrome(options=options)
-            self.driver.implicitly_wait(10)
+            # No implicit wait: it would stall every empty find_elements poll;
+            # waits are explicit via WebDriverWait instead
+            # Own process group, so cleanup can kill chromedriver and the
+            # Chrome processes it starts together
+            service = Service(popen_kw={"start_new_session": True})
+            self.driver = webdriver.Chrome(service=service, options=options)
+            # Bound page loads and scripts so a stuck page cannot hang the run
+            self.driver.set_page_load_timeout(15)
+            self.driver.set_script_timeout(10)
             self.logger.info("WebDriver initialized successfully")
         except Exception as e:
             self.logger.error(f"Failed to initialize WebDriver: {str(e)}")
@@ -55,6 +103,7 @@ class WebAutomation:
         """Navigate to the specified URL"""
         try:
             self.driver.get(self.url)
+            self.driver.execute_script(OBSERVE_MESSAGES_JS, MESSAGE_SELECTOR)
             self.logger.info(f"Navigated to {self.url}")
         except Exception as e:
             self.logger.error(f"Failed to navigate to URL: {str(e)}")
@@ -82,34 +131,37 @@ class WebAutomation:
         try:
             # Wait for initial response
             time.sleep(2)
-            last_message_count = 0
 
             # Monitor for 5 minutes maximum
             start_time = time.time()
             while time.time() - start_time < 120:  # 2 minute timeout
-                # Find all chat messages
-                messages = self.driver.find_elements(
-                    By.CSS_SELECTOR, "div[class*='text-l text-[#f7f7f7]']"
-                )
+                # Wait up to a second for the observer to queue new messages
+                try:
+                    new_messages = WebDriverWait(
+                        self.driver, 1, poll_frequency=0.2
+                    ).until(lambda driver: driver.execute_script(TAKE_NEW_MESSAGES_JS))
+                except TimeoutException:
+                    new_messages = []
 
-                if len(messages) > last_message_count:
-                    # New messages found
-                    for msg in messages[last_message_count:]:
-                        message_text = msg.text.strip()
-                        if message_text:
-                            self.chat_output.append(message_text)
-                            self.logger.info(
-                                f"New message recorded: {message_text[:50]}..."
-                            )
-
-                    last_message_count = len(messages)
+                if new_messages:
+                    added = 0
+                    for index, text in new_messages:
+                        # Indices are handed out in order, so an unseen one is next
+                        if index < len(self.chat_output):
+                            self.chat_output[index] = text
+                        else:
+                            self.chat_output.append(text)
+                            added += 1
+                    self.logger.info(
+                        f"Recorded {added} new messages, "
+                        f"{len(new_messages) - added} updates, latest: "
+                        f"{new_messages[-1][1][:50]}..."
+                    )
 
                 # Check if task is complete (implement based on your specific completion indicators)
                 if self.is_task_complete():
                     break
 
-                time.sleep(1)
-
             self.logger.info(f"Recorded {len(self.chat_output)} messages")
         except Exception as e:
             self.logger.error(f"Error monitoring chat output: {str(e)}")
@@ -120,35 +172,32 @@ class WebAutomation:
         try:
             # Implement your task completion detection logic here
             # For example, look for specific completion messages or states
-            completion_indicators = [
-                "Task completed",
-                "Done",
-                "Finished",
-                "GraphRecursionError",
-            ]
-
-            last_messages = self.chat_output[-3:] if self.chat_output else []
-            return any(
-                indicator in msg
-                for msg in last_messages
-                for indicator in completion_indicators
-            )
+            return any(_COMPLETION_RE.search(msg) for msg in self.chat_output[-3:])
         except Exception:
             return False
 
     def save_results(self):
         """Save the task results to a file"""
         try:
+            # One clock read for both the record and the filename
+            now = datetime.now()
             output_data = {
                 "task": self.task,
                 "chat_output": self.chat_output,
                 "status": "completed" if self.chat_output else "error",
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": now.isoformat(),
             }
 
-            filename = f"task_output_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+            filename = f"task_output_{now.strftime('%Y%m%d_%H%M%S')}.json"
+            # Serialize in one call and write once rather than in many chunks
+            if self.pretty:
+                payload = json.dumps(output_data, indent=2, ensure_ascii=False)
+            else:
+                payload = json.dumps(
+                    output_data, separators=(",", ":"), ensure_ascii=False
+                )
             with open(filename, "w", encoding="utf-8") as f:
-                json.dump(output_data, f, indent=2, ensure_ascii=False)
+                f.write(payload)
 
             self.logger.info(f"Results saved to {filename}")
             return filename
@@ -158,12 +207,46 @@ class WebAutomation:
 
     def cleanup(self):
         """Clean up resources"""
-        if self.driver:
-            try:
-                self.driver.quit()
-                self.logger.info("Browser closed successfully")
-            except Exception as e:
-                self.logger.error(f"Error closing browser: {str(e)}")
+        if not self.driver:
+            return
+
+        # quit() can hang on a stuck browser, so give it a bounded time
+        quit_result = {}
+        quitter = threading.Thread(
+            target=self._quit_driver, args=(quit_result,), daemon=True
+        )
+        quitter.start()
+        quitter.join(QUIT_TIMEOUT)
+
+        if quit_result.get("ok"):
+            self.logger.info("Browser closed successfully")
+        elif quitter.is_alive():
+            self.logger.error(f"Closing browser timed out after {QUIT_TIMEOUT}s")
+        else:
+            self.logger.error(f"Error closing browser: {quit_result.get('error')}")
+
+        process = getattr(self.driver.service, "process", None)
+        if process and (not quit_result.get("ok") or process.poll() is None):
+            self._kill_driver_processes(process)
+
+    def _quit_driver(self, result):
+        """Run driver.quit(), recording whether it succeeded in result"""
+        try:
+            self.driver.quit()
+            result["ok"] = True
+        except Exception as e:
+            result["error"] = str(e)
+
+    def _kill_driver_processes(self, process):
+        """Kill chromedriver and the Chrome processes in its process group"""
+        try:
+            if hasattr(os, "killpg"):
+                os.killpg(process.pid, signal.SIGKILL)
+            else:
+                process.kill()
+            self.logger.warning("Killed lingering chromedriver and browser processes")
+        except (ProcessLookupError, PermissionError):
+            pass
 
     def run(self):
         """Main execution method"""
@@ -187,10 +270,13 @@ def main():
     )
     parser.add_argument("--url", required=True, help="URL to navigate to")
     parser.add_argument("--task", required=True, help="Task to enter in chat")
+    parser.add_argument(
+        "--pretty", action="store_true", help="Indent the JSON results file"
+    )
     args = parser.parse_args()
 
     try:
-        automation = WebAutomation(args.url, args.task)
+        automation = WebAutomation(args.url, args.task, pretty=args.pretty)
         output_file = automation.run()
         print(f"Task completed. Results saved to: {output_file}")
     except Exception as e:
@@ -14,19 +14,38 @@
 #
 # SPDX-License-Identifier: Apache-2.0"
 import asyncio
-import json
 import logging
 import os
 from datetime import datetime
 import websockets
 from urllib.parse import urljoin
 import argparse
+from json_utils import json_dumps, json_loads
+
+
+def _calls_terminate(executor: dict) -> bool:
+    """Whether any executor message calls the terminate tool."""
+    for msg in executor.get("messages", []):
+        for call in msg.get("tool_calls") or ():
+            if call.get("name") == "terminate":
+                return True
+    return False
 
 
 class WebAutomation:
-    def __init__(self, url, task):
+    def __init__(
+        self, url, task, pretty=False, idle_timeout=30.0, max_idle_timeouts=10
+    ):
         self.url = url
         self.task = task
+        # Seconds without a frame before pinging, and how many such idle
+        # periods in a row before giving up on the run
+        self.idle_timeout = idle_timeout
+        self.max_idle_timeouts = max_idle_timeouts
+        # Results are machine-read by default, so written compact
+        self.pretty = pretty
+        # Encoded once; sent as a text frame since the backend uses receive_text()
+        self._task_payload = json_dumps({"task": task, "add_infos": ""}).decode("utf-8")
         self.setup_logging()
         self.status = ""
 
@@ -42,16 +61,27 @@ class WebAutomation:
         self.logger.info(f"Connecting to WebSocket at {ws_url}")
 
         try:
-            async with websockets.connect(ws_url) as websocket:
+            # State frames are small JSON and arrive often, so skip per-frame
+            # deflate; large page states must not trip the 1 MiB default limit
+            async with websockets.connect(
+                ws_url, compression=None, max_size=None, max_queue=64
+            ) as websocket:
                 # Send task
-                message = {"task": self.task, "add_infos": ""}
-                await websocket.send(json.dumps(message))
+                await websocket.send(self._task_payload)
                 self.logger.info("Task sent to WebSocket")
 
                 # Wait for execution_started message with run_id
                 while True:
                     message = await websocket.recv()
-                    data = json.loads(message)
+                    # Only parse frames that could be the one we are waiting for
+                    marker = (
+                        "execution_started"
+                        if isinstance(message, str)
+                        else b"execution_started"
+                    )
+                    if marker not in message:
+                        continue
+                    data = json_loads(message)
 
                     if data.get("type") == "execution_started":
                         run_id = data.get("run_id")
@@ -72,32 +102,44 @@ class WebAutomation:
 
     async def monitor_execution(self, websocket):
         """Monitor the execution and collect outputs"""
+        idle_timeouts = 0
         try:
             while True:
-                message = await websocket.recv()
-                data = json.loads(message)
-
-                # Check for termination/completion
-                if any(
-                    [
-                        # Normal completion via type
-                        data.get("type") == "execution_completed",
-                        # Termination via executor state
-                        isinstance(data.get("executor"), dict)
-                        and data["executor"].get("exiting") is True,
-                        # Tool-based termination
-                        any(
-                            msg.get("tool_calls", [])
-                            and any(
-                                call.get("name") == "terminate"
-                                for call in msg.get("tool_calls", [])
-                            )
-                            for msg in data.get("executor", {}).get("messages", [])
-                        ),
-                    ]
+                try:
+                    message = await asyncio.wait_for(
+                        websocket.recv(), timeout=self.idle_timeout
+                    )
+                except asyncio.TimeoutError:
+                    idle_timeouts += 1
+                    if idle_timeouts >= self.max_idle_timeouts:
+                        self.logger.error(
+                            f"No messages for {idle_timeouts * self.idle_timeout:.0f}s"
+                            " - giving up"
+                        )
+                        self.status = "websocket idle timeout"
+                        return
+                    # Check the connection is still alive; a dead one raises
+                    await websocket.ping()
+                    continue
+                idle_timeouts = 0
+                data = json_loads(message)
+
+                # Check for termination/completion, cheapest checks first
+                executor = data.get("executor")
+                if (
+                    # Normal completion via type
+                    data.get("type") == "execution_completed"
+                    # Termination via executor state or the terminate tool
+                    or (
+                        isinstance(executor, dict)
+                        and (
+                            executor.get("exiting") is True
+                            or _calls_terminate(executor)
+                        )
+                    )
                 ):
                     self.logger.info("Execution completed")
-                    if isinstance(data.get("executor"), dict):
+                    if isinstance(executor, dict):
                         self.status = "success"
                     break
 
@@ -126,23 +168,25 @@ class WebAutomation:
     def save_results(self, run_id: str, filename: str = None):
         """Save the task results and trace data to a file"""
         try:
+            # One clock read for both the record and the filename
+            now = datetime.now()
             output_data = {
                 "task": self.task,
                 "run_id": run_id,
                 "status": self.status,
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": now.isoformat(),
                 "langsmith_project": os.getenv("LANGSMITH_PROJECT"),
             }
 
             # Use existing filename if provided, otherwise create new one
             if not filename:
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                timestamp = now.strftime("%Y%m%d_%H%M%S")
                 run_id_part = f"_{run_id}" if run_id else ""
                 filename = f"task_output{run_id_part}_{timestamp}.json"
 
             # Update the file with current status
-            with open(filename, "w", encoding="utf-8") as f:
-                json.dump(output_data, f, indent=2, ensure_ascii=False)
+            with open(filename, "wb") as f:
+                f.write(json_dumps(output_data, indent=self.pretty))
 
             self.logger.info(f"Results saved/updated in {filename}")
             return filename
@@ -160,14 +204,10 @@ class WebAutomation:
             if not run_id:
                 self.logger.warning("No run_id received, execution may have failed")
 
-            # Create initial output file
+            # connect_websocket only returns once monitoring has ended, so the
+            # status is final; write it once
             output_file = self.save_results(run_id)
 
-            # Keep updating status until completion
-            while self.status not in ["success", "graph recursion error"]:
-                await asyncio.sleep(1)
-                output_file = self.save_results(run_id, filename=output_file)
-
             return output_file
         except Exception as e:
             self.logger.error(f"Automation failed: {str(e)}")
@@ -189,10 +229,39 @@ def main():
     )
     parser.add_argument("--url", required=True, help="URL of the backend server")
     parser.add_argument("--task", required=True, help="Task to execute")
+    parser.add_argument(
+        "--pretty", action="store_true", help="Indent the JSON results file"
+    )
+    parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=30.0,
+        help="Seconds without a message before pinging the server",
+    )
+    parser.add_argument(
+        "--max-idle-timeouts",
+        type=int,
+        default=10,
+        help="Consecutive idle timeouts before the run is abandoned",
+    )
     args = parser.parse_args()
 
     try:
-        automation = WebAutomation(args.url, args.task)
+        # Optional faster event loop for the websocket receive loop
+        import uvloop
+
+        uvloop.install()
+    except ImportError:
+        pass
+
+    try:
+        automation = WebAutomation(
+            args.url,
+            args.task,
+            pretty=args.pretty,
+            idle_timeout=args.idle_timeout,
+            max_idle_timeouts=args.max_idle_timeouts,
+        )
         output_file = asyncio.run(automation.run())
         print(f"Task completed. Results saved to: {output_file}")
     except Exception as e: